@@ -1,10 +1,39 @@
+import ctypes
+import hashlib
+import io
+import queue
+import struct
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from itertools import chain
+import numpy as np
 import pandas as pd
+from psycopg2.extras import execute_values
 from sqlalchemy import create_engine, text
 import os
 from typing import Optional
 import logging
 from dotenv import load_dotenv
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+except ImportError:  # pyarrow is optional, pandas' own parser is used without it
+    pa = None
+    pc = None
+    pacsv = None
+
+try:
+    import polars as pl
+    if not hasattr(pl.LazyFrame, 'collect_batches'):  # older polars can't stream batches
+        pl = None
+except ImportError:  # polars is optional, large files are chunked with pandas without it
+    pl = None
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -15,6 +44,103 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Signature, flags and header extension length of PostgreSQL's binary COPY format
+PGCOPY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0)
+PGCOPY_TRAILER = struct.pack('>h', -1)
+
+# Fields pandas' CSV parser reads as missing by default, for the other parsers to match
+PANDAS_NA_VALUES = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+]
+
+# Size, mtime and hash of each file as of its last successful load
+METADATA_TABLE = '_ingestion_metadata'
+
+try:
+    libc = ctypes.CDLL('libc.so.6')
+except OSError:  # not glibc, freed memory is left to the allocator
+    libc = None
+
+
+def _put_until_stopped(q: queue.Queue, item, stop_event: threading.Event) -> bool:
+    """Put an item on a bounded queue, giving up once its consumer has stopped"""
+    while not stop_event.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+class PrefetchReader(io.RawIOBase):
+    """Read-only file whose blocks are read ahead by a background thread"""
+    
+    def __init__(self, file_path: str, block_size: int, blocks: int):
+        """
+        Open the file and start reading ahead
+        
+        Args:
+            file_path: Path of the file to read
+            block_size: Bytes per read issued by the background thread
+            blocks: Max blocks read ahead of the consumer (bounds memory)
+        """
+        super().__init__()
+        self._fd = os.open(file_path, os.O_RDONLY)
+        if hasattr(os, 'posix_fadvise'):
+            try:
+                os.posix_fadvise(self._fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            except OSError:
+                os.close(self._fd)
+                raise
+        
+        self._blocks = queue.Queue(maxsize=blocks)
+        self._stop_event = threading.Event()
+        self._pending = memoryview(b'')
+        self._eof = False
+        self._error = None
+        self._thread = threading.Thread(target=self._read_ahead, args=(block_size,), daemon=True)
+        self._thread.start()
+    
+    def _read_ahead(self, block_size: int) -> None:
+        """Fill the queue with blocks until EOF (an empty block) or close"""
+        try:
+            while True:
+                block = os.read(self._fd, block_size)
+                if not _put_until_stopped(self._blocks, block, self._stop_event) or not block:
+                    return
+        except Exception as e:
+            # Hand any error to the consumer, which would otherwise wait forever
+            _put_until_stopped(self._blocks, e, self._stop_event)
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, b) -> int:
+        # The background thread has exited after an error, so don't wait on it again
+        if self._error is not None:
+            raise self._error
+        if not self._pending and not self._eof:
+            block = self._blocks.get()
+            if isinstance(block, Exception):
+                self._error = block
+                raise block
+            self._eof = not block
+            self._pending = memoryview(block)
+        
+        n = min(len(b), len(self._pending))
+        b[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+    
+    def close(self) -> None:
+        if not self.closed:
+            self._stop_event.set()
+            self._thread.join()
+            os.close(self._fd)
+        super().close()
+
 
 class CSVToPostgresPipeline:
     """Pipeline to read CSV files and upload them to PostgreSQL database"""
@@ -25,7 +151,7 @@ class CSVToPostgresPipeline:
         
         Args:
             csv_folder_path: Optional override for CSV folder path
-            chunk_size: Optional override for chunk size
+            chunk_size: Optional override for chunk size (rows), sized from CHUNK_BYTES if unset
         """
         # Load database credentials from environment
         self.db_host = os.getenv('DB_HOST')
@@ -45,9 +171,9 @@ class CSVToPostgresPipeline:
                 f"See .env.example for template."
             )
         
-        # Build connection string securely
+        # Build connection string securely (psycopg2 driver is required for COPY)
         self.db_connection_string = (
-            f"postgresql://{self.db_user}:{self.db_password}"
+            f"postgresql+psycopg2://{self.db_user}:{self.db_password}"
             f"@{self.db_host}:{self.db_port}/{self.db_name}"
         )
         
@@ -56,17 +182,63 @@ class CSVToPostgresPipeline:
         if not self.csv_folder_path:
             raise ValueError("CSV_FOLDER_PATH must be set in environment or passed as argument")
             
-        self.chunk_size = chunk_size or int(os.getenv('CHUNK_SIZE', '100000'))
+        self.chunk_size = chunk_size or int(os.getenv('CHUNK_SIZE', '0'))
+        # In-memory size targeted per chunk when no fixed chunk size is given
+        self.chunk_bytes = int(os.getenv('CHUNK_BYTES', str(256 << 20)))
+        # Min rows read up front to infer each table's schema (a whole chunk when larger)
+        self.schema_sample_rows = int(os.getenv('SCHEMA_SAMPLE_ROWS', '50000'))
+        # Buffer size for sequential reads of CSV files
+        self.read_buffer_size = int(os.getenv('READ_BUFFER_SIZE', str(8 << 20)))
+        # Blocks read ahead in the background on Linux (0 disables read-ahead)
+        self.prefetch_blocks = int(os.getenv('PREFETCH_BLOCKS', '4')) if sys.platform.startswith('linux') else 0
+        # Bytes per block handed to each pyarrow parser thread
+        self.csv_block_size = int(os.getenv('CSV_BLOCK_SIZE', str(8 << 20)))
+        # Load with COPY, or with batched INSERTs where COPY is unavailable ('0')
+        self.use_copy = os.getenv('USE_COPY', '1') != '0'
+        # Stream files straight from disk into COPY, without parsing them
+        self.stream_copy = os.getenv('STREAM_COPY', '0') == '1'
+        # Create tables UNLOGGED ('1'): their rows skip WAL, but PostgreSQL
+        # empties them after a crash and doesn't replicate them
+        self.unlogged_load = os.getenv('UNLOGGED_LOAD', '0') == '1'
+        # Skip files whose size and mtime match their last successful load
+        self.skip_unchanged = os.getenv('SKIP_UNCHANGED', '1') != '0'
+        # Compare a SHA-256 of the file contents too, instead of trusting the mtime
+        self.verify_hash = os.getenv('VERIFY_HASH', '0') == '1'
+        # Max chunks read ahead of the upload (bounds memory of large file loads)
+        self.chunk_queue_size = int(os.getenv('CHUNK_QUEUE_SIZE', '2'))
+        # Worker processes used to ingest the remaining files in parallel
+        self.max_workers = int(os.getenv('MAX_WORKERS', '0')) or os.cpu_count() or 1
         self.engine = None
+        # Staging buffer for COPY data, reused across chunks
+        self._copy_buf = io.BytesIO()
+        # Files loaded in the main process, in CHUNK_SIZE rows per chunk when it is set
         self.large_files = os.getenv('LARGE_FILES', 'sales.csv').split(',')
         
         logger.info(f"Pipeline initialized for folder: {self.csv_folder_path}")
         logger.info(f"Database: {self.db_name} on {self.db_host}:{self.db_port}")
         
+    def __getstate__(self) -> dict:
+        """Drop the engine when pickling, worker processes create their own"""
+        state = self.__dict__.copy()
+        state['engine'] = None
+        state['_copy_buf'] = io.BytesIO()
+        return state
+        
     def connect_to_database(self) -> bool:
         """Establish database connection"""
         try:
-            self.engine = create_engine(self.db_connection_string)
+            self.engine = create_engine(
+                self.db_connection_string,
+                # A one-shot bulk load holds at most two connections per process
+                # (the load itself plus schema generation), so no pings or overflow
+                pool_pre_ping=False,
+                pool_size=2,
+                max_overflow=0,
+                # Batch any executemany() issued through SQLAlchemy
+                executemany_mode='values_plus_batch',
+                insertmanyvalues_page_size=10_000,
+                executemany_batch_page_size=500
+            )
             # Test connection
             with self.engine.connect() as conn:
                 conn.execute(text("SELECT 1"))
@@ -78,79 +250,644 @@ class CSVToPostgresPipeline:
     
     def clean_column_names(self, df: pd.DataFrame) -> pd.DataFrame:
         """Clean column names by removing spaces and extra whitespace"""
-        df.columns = [c.strip().replace(' ', '') for c in df.columns]
+        df.columns = df.columns.str.strip().str.replace(' ', '', regex=False)
         return df
     
+    def _open_csv(self, file_path: str):
+        """Open a CSV file in binary mode for one large-buffered sequential pass"""
+        if self.prefetch_blocks:
+            # Disk reads overlap with parsing/uploading instead of blocking them
+            return io.BufferedReader(
+                PrefetchReader(file_path, self.read_buffer_size, self.prefetch_blocks)
+            )
+        
+        f = open(file_path, 'rb', buffering=self.read_buffer_size)
+        if hasattr(os, 'posix_fadvise'):
+            # Ask the kernel for more aggressive readahead (not available on Windows/macOS)
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        return f
+    
     def get_table_name(self, filename: str) -> str:
         """Convert filename to valid table name"""
         return filename.replace('.csv', '').replace('-', '_').lower()
     
-    def process_large_file(self, file_path: str, table_name: str) -> bool:
-        """Process large CSV files in chunks"""
-        logger.info(f"Using memory-safe chunking for large file")
+    def _quote_identifier(self, name: str) -> str:
+        """Quote a table or column name for use in raw SQL"""
+        return '"' + name.replace('"', '""') + '"'
+    
+    def _pandas_read_options(self) -> dict:
+        """Extra pd.read_csv options, Arrow-backed columns when pyarrow is available"""
+        # Arrow-backed columns avoid one Python object per string value
+        return {'dtype_backend': 'pyarrow'} if pa is not None else {}
+    
+    def _read_sample(self, file_path: str, rows: int) -> pd.DataFrame:
+        """Read the first rows of a CSV file, used to infer the table schema"""
+        with self._open_csv(file_path) as f:
+            sample = pd.read_csv(f, nrows=rows, **self._pandas_read_options())
+        sample = self.clean_column_names(sample)
+        
+        # Columns with no values in the sample have no type to infer, load them as text
+        empty = sample.columns[sample.isna().all()]
+        text_dtype = pd.ArrowDtype(pa.string()) if pa is not None else object
+        return sample.astype({name: text_dtype for name in empty})
+    
+    def _chunk_dtypes(self, sample: pd.DataFrame) -> dict:
+        """pandas dtypes that parse every chunk into the sampled table schema"""
+        dtypes = {}
+        for name, dtype in sample.dtypes.items():
+            if isinstance(dtype, pd.ArrowDtype):
+                dtypes[name] = dtype  # already nullable
+            elif pd.api.types.is_bool_dtype(dtype):
+                dtypes[name] = 'boolean'
+            elif pd.api.types.is_integer_dtype(dtype):
+                dtypes[name] = 'Int64'  # stays integer when later chunks have missing values
+            elif pd.api.types.is_float_dtype(dtype):
+                dtypes[name] = 'float64'
+            else:
+                dtypes[name] = object
+        return dtypes
+    
+    def _polars_schema(self, sample: pd.DataFrame) -> dict:
+        """polars column types matching the sampled table schema"""
+        schema = {}
+        for name, dtype in sample.dtypes.items():
+            if pd.api.types.is_bool_dtype(dtype):
+                schema[name] = pl.Boolean
+            elif pd.api.types.is_integer_dtype(dtype):
+                schema[name] = pl.Int64
+            elif pd.api.types.is_float_dtype(dtype):
+                schema[name] = pl.Float64
+            else:
+                schema[name] = pl.String
+        return schema
+    
+    def _arrow_schema(self, sample: pd.DataFrame) -> dict:
+        """pyarrow column types matching the sampled table schema"""
+        schema = {}
+        for name, dtype in sample.dtypes.items():
+            if pd.api.types.is_bool_dtype(dtype):
+                schema[name] = pa.bool_()
+            elif pd.api.types.is_integer_dtype(dtype):
+                schema[name] = pa.int64()
+            elif pd.api.types.is_float_dtype(dtype):
+                schema[name] = pa.float64()
+            else:
+                schema[name] = pa.string()
+        return schema
+    
+    @contextmanager
+    def _bulk_load_transaction(self):
+        """Yield a cursor on one raw connection, committed once when the load is done"""
+        conn = self.engine.raw_connection()
+        try:
+            cur = conn.cursor()
+            # Bulk load tuning, scoped to this transaction
+            cur.execute("SET LOCAL synchronous_commit = off")
+            cur.execute("SET LOCAL maintenance_work_mem = '1GB'")
+            yield cur
+            cur.close()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    
+    def _create_table(self, cur, df, table_name: str) -> None:
+        """Drop and recreate a table with the schema pandas would give the DataFrame"""
+        create_sql = pd.io.sql.get_schema(df.head(0), table_name, con=self.engine)
+        if self.unlogged_load:
+            create_sql = create_sql.replace('CREATE TABLE', 'CREATE UNLOGGED TABLE', 1)
+        cur.execute(f"DROP TABLE IF EXISTS {self._quote_identifier(table_name)}")
+        cur.execute(create_sql)
+    
+    def _binary_copy_buffer(self, df, buf: io.BytesIO) -> bool:
+        """
+        Encode a chunk into buf in PostgreSQL's binary COPY format
+        
+        Only chunks whose columns are all integer, float or boolean and have no
+        missing values qualify: every row then has the same width, so the whole
+        chunk is laid out with one NumPy structured array instead of per-row code.
+        
+        Returns:
+            bool: False, with buf left untouched, if the chunk needs CSV instead
+        """
+        is_pandas = isinstance(df, pd.DataFrame)
+        fields = [('count', '>i2')]
+        arrays = []
+        for i, name in enumerate(df.columns):
+            series = df[name]
+            dtype = series.dtype
+            if is_pandas:
+                is_bool = pd.api.types.is_bool_dtype(dtype)
+                is_int = pd.api.types.is_integer_dtype(dtype)
+                is_float = pd.api.types.is_float_dtype(dtype)
+            else:
+                is_bool, is_int, is_float = dtype == pl.Boolean, dtype.is_integer(), dtype.is_float()
+            
+            # Wire types of the BOOLEAN, BIGINT and DOUBLE PRECISION columns we create
+            if is_bool:
+                wire_type, np_type = '?', bool
+            elif is_int:
+                wire_type, np_type = '>i8', 'int64'
+            elif is_float:
+                wire_type, np_type = '>f8', 'float64'
+            else:
+                return False
+            
+            has_nulls = series.isna().any() if is_pandas else series.null_count() > 0
+            if has_nulls:
+                return False
+            
+            fields += [(f'len{i}', '>i4'), (f'val{i}', wire_type)]
+            arrays.append(series.to_numpy().astype(np_type, copy=False))
+        
+        rows = np.empty(len(df), dtype=fields)
+        rows['count'] = len(arrays)
+        for i, values in enumerate(arrays):
+            rows[f'len{i}'] = rows.dtype[f'val{i}'].itemsize
+            rows[f'val{i}'] = values
+        
+        buf.write(PGCOPY_HEADER)
+        buf.write(rows.data)
+        buf.write(PGCOPY_TRAILER)
+        return True
+    
+    def _insert_chunk(self, cur, df, table_name: str) -> None:
+        """Insert a pandas or polars DataFrame with batched multi-row INSERTs"""
+        columns = ', '.join(self._quote_identifier(c) for c in df.columns)
+        insert_sql = f"INSERT INTO {self._quote_identifier(table_name)} ({columns}) VALUES %s"
+        
+        if isinstance(df, pd.DataFrame):
+            # Plain Python values, with None for every kind of missing value
+            rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+        else:
+            rows = df.iter_rows()
+        execute_values(cur, insert_sql, rows, page_size=10_000)
+    
+    def _copy_chunk(self, cur, df, table_name: str) -> None:
+        """COPY a pandas or polars DataFrame into a table created in this transaction"""
+        if not self.use_copy:
+            self._insert_chunk(cur, df, table_name)
+            return
+        
+        columns = ', '.join(self._quote_identifier(c) for c in df.columns)
+        
+        # Overwrite the buffer from the start and cut off what is left of the
+        # previous chunk, so its memory is reused instead of reallocated
+        buf = self._copy_buf
+        buf.seek(0)
+        if self._binary_copy_buffer(df, buf):
+            copy_format = 'FORMAT BINARY'
+        else:
+            # FORCE_NULL: a lone missing value is written as "" which COPY would load as ''
+            copy_format = f'FORMAT CSV, HEADER FALSE, FORCE_NULL ({columns})'
+            if isinstance(df, pd.DataFrame):
+                df.to_csv(buf, index=False, header=False)
+            else:
+                df.write_csv(buf, include_header=False)
+        buf.truncate()
+        buf.seek(0)
+        
+        # FREEZE writes rows pre-frozen (no later VACUUM FREEZE), which PostgreSQL
+        # only allows when the table was created in the current transaction
+        copy_sql = (
+            f"COPY {self._quote_identifier(table_name)} ({columns}) "
+            f"FROM STDIN WITH ({copy_format}, FREEZE)"
+        )
+        cur.copy_expert(copy_sql, buf)
+    
+    def _infer_arrow_column(self, column):
+        """Type a pyarrow text column like pandas would: integer, float, boolean or text"""
+        if column.null_count == len(column):
+            return column  # no values to infer from, loaded as text
+        
+        # Types are tried on the first values before the whole column, so text
+        # columns are ruled out without converting all of their values
+        head = column.slice(0, 1000)
+        for arrow_type in (pa.int64(), pa.float64()):
+            try:
+                pc.cast(pc.utf8_trim_whitespace(head), arrow_type)
+                return pc.cast(pc.utf8_trim_whitespace(column), arrow_type)
+            except pa.ArrowInvalid:
+                continue
+        
+        booleans = pa.array(['true', 'false'])
+        if pc.all(pc.is_in(pc.drop_null(pc.utf8_lower(head)), value_set=booleans)).as_py():
+            lowered = pc.utf8_lower(column)
+            if pc.all(pc.is_in(pc.drop_null(lowered), value_set=booleans)).as_py():
+                return pc.equal(lowered, 'true')
+        return column
+    
+    def _infer_polars_column(self, column: 'pl.Series') -> 'pl.Series':
+        """Type a polars text column like pandas would: integer, float, boolean or text"""
+        if column.null_count() == len(column):
+            return column  # no values to infer from, loaded as text
+        
+        # Types are tried on the first values before the whole column, like for pyarrow
+        head = column.head(1000)
+        for dtype in (pl.Int64, pl.Float64):
+            try:
+                head.str.strip_chars().cast(dtype)
+                return column.str.strip_chars().cast(dtype)
+            except pl.exceptions.InvalidOperationError:
+                continue
+        
+        if head.str.to_lowercase().drop_nulls().is_in(['true', 'false']).all():
+            lowered = column.str.to_lowercase()
+            if lowered.drop_nulls().is_in(['true', 'false']).all():
+                return lowered == 'true'
+        return column
+    
+    def _read_first_chunk(self, file_path: str, columns: list, rows: int):
+        """
+        Read the first rows of a CSV file with a multithreaded parser, typed from all of them
+        
+        Values are parsed as text and typed afterwards, since pyarrow and polars
+        would otherwise only infer types from their first block of rows. Dates
+        stay text and missing values match pandas, like the tables pandas produces.
+        
+        Returns:
+            A pandas DataFrame, or a polars one when only polars is installed
+        """
+        if pacsv is not None:
+            read_options = pacsv.ReadOptions(
+                use_threads=True,
+                block_size=self.csv_block_size,
+                column_names=columns,
+                skip_rows=1
+            )
+            convert_options = pacsv.ConvertOptions(
+                column_types={name: pa.string() for name in columns},
+                null_values=PANDAS_NA_VALUES,
+                strings_can_be_null=True
+            )
+            batches = []
+            read = 0
+            with pacsv.open_csv(file_path, read_options=read_options, convert_options=convert_options) as reader:
+                for batch in reader:
+                    batches.append(batch)
+                    read += batch.num_rows
+                    if read >= rows:
+                        break
+                table = pa.Table.from_batches(batches, schema=reader.schema).slice(0, rows)
+            
+            arrays = [self._infer_arrow_column(column) for column in table.columns]
+            return self._arrow_to_pandas(pa.Table.from_arrays(arrays, names=columns))
+        
+        if pl is not None:
+            chunk = pl.scan_csv(
+                file_path,
+                new_columns=columns,
+                infer_schema=False,
+                null_values=PANDAS_NA_VALUES,
+                n_rows=rows
+            ).collect()
+            return pl.DataFrame([self._infer_polars_column(column) for column in chunk.get_columns()])
+        
+        return self._read_sample(file_path, rows)
+    
+    def _pandas_schema(self, df) -> pd.DataFrame:
+        """Empty pandas DataFrame with the column types of a polars DataFrame"""
+        columns = {}
+        for name, dtype in df.schema.items():
+            if dtype == pl.Boolean:
+                columns[name] = pd.Series(dtype='boolean')
+            elif dtype == pl.Int64:
+                columns[name] = pd.Series(dtype='Int64')
+            elif dtype == pl.Float64:
+                columns[name] = pd.Series(dtype='float64')
+            else:
+                columns[name] = pd.Series(dtype=object)
+        return pd.DataFrame(columns)
+    
+    def _rows_per_chunk(self, file_path: str, sample: pd.DataFrame) -> int:
+        """Rows per chunk: the fixed chunk size for large files, otherwise CHUNK_BYTES worth of sample rows"""
+        if self.chunk_size and os.path.basename(file_path) in self.large_files:
+            return self.chunk_size
+        if sample.empty:
+            return max(self.chunk_size, self.schema_sample_rows)
         
+        # Wide tables get fewer rows per chunk, narrow tables more; a small
+        # file fits in a single chunk and is loaded in one pass
+        bytes_per_row = sample.memory_usage(deep=True, index=False).sum() / len(sample)
+        return max(self.chunk_size, 1, int(self.chunk_bytes / bytes_per_row))
+    
+    def _iter_chunks_polars(self, file_path: str, sample: pd.DataFrame, chunk_rows: int, skip_rows: int):
+        """Yield cleaned chunks from polars' multithreaded streaming CSV reader"""
+        schema = self._polars_schema(sample)
+        # Numbers are read as text and stripped first, since pandas accepts
+        # padded numbers like " 5" and polars' number parser doesn't
+        numeric = [name for name, dtype in schema.items() if dtype in (pl.Int64, pl.Float64)]
+        lf = pl.scan_csv(
+            file_path,
+            new_columns=list(sample.columns),
+            schema_overrides={name: dtype for name, dtype in schema.items() if dtype == pl.Boolean},
+            infer_schema=False,
+            null_values=PANDAS_NA_VALUES,
+            skip_rows_after_header=skip_rows
+        ).with_columns(pl.col(name).str.strip_chars().cast(schema[name]) for name in numeric)
+        yield from lf.collect_batches(chunk_size=chunk_rows, engine='streaming')
+    
+    def _iter_chunks_pyarrow(self, file_path: str, sample: pd.DataFrame, chunk_rows: int, skip_rows: int):
+        """Yield cleaned chunks from pyarrow's multithreaded streaming CSV reader"""
+        read_options = pacsv.ReadOptions(
+            use_threads=True,
+            block_size=self.csv_block_size,
+            column_names=list(sample.columns),
+            skip_rows=1,
+            skip_rows_after_names=skip_rows
+        )
+        # Same missing values as pandas; pyarrow already accepts padded numbers
+        convert_options = pacsv.ConvertOptions(
+            column_types=self._arrow_schema(sample),
+            null_values=PANDAS_NA_VALUES,
+            strings_can_be_null=True
+        )
+        
+        # Given the path, pyarrow reads ahead natively instead of through Python
+        with pacsv.open_csv(file_path, read_options=read_options, convert_options=convert_options) as reader:
+            # Blocks are regrouped into chunks of chunk_rows rows
+            batches = []
+            rows = 0
+            for batch in reader:
+                batches.append(batch)
+                rows += batch.num_rows
+                while rows >= chunk_rows:
+                    table = pa.Table.from_batches(batches)
+                    yield self._arrow_to_pandas(table.slice(0, chunk_rows))
+                    batches = table.slice(chunk_rows).to_batches()
+                    rows -= chunk_rows
+            if rows:
+                yield self._arrow_to_pandas(pa.Table.from_batches(batches))
+    
+    def _arrow_to_pandas(self, table) -> pd.DataFrame:
+        """Convert an Arrow table to a DataFrame that keeps Arrow-backed columns"""
+        return table.to_pandas(types_mapper=pd.ArrowDtype, split_blocks=True)
+    
+    def _iter_chunks(self, file_path: str, sample: pd.DataFrame, chunk_rows: int, skip_rows: int = 0):
+        """Yield cleaned CSV chunks typed like the sample, after the first skip_rows rows"""
+        if pl is not None:
+            yield from self._iter_chunks_polars(file_path, sample, chunk_rows, skip_rows)
+            return
+        if pacsv is not None:
+            yield from self._iter_chunks_pyarrow(file_path, sample, chunk_rows, skip_rows)
+            return
+        
+        # Cleaned names and sampled types are applied by the parser to every chunk
+        with self._open_csv(file_path) as f:
+            yield from pd.read_csv(
+                f,
+                chunksize=chunk_rows,
+                names=list(sample.columns),
+                header=0,
+                skiprows=range(1, skip_rows + 1),
+                dtype=self._chunk_dtypes(sample),
+                **self._pandas_read_options()
+            )
+    
+    def _split_rows(self, df, rows: int):
+        """Yield a pandas or polars DataFrame in slices of at most rows rows"""
+        for start in range(0, len(df), rows):
+            yield df[start:start + rows]
+    
+    def _read_chunks(self, chunks, chunk_queue: queue.Queue, stop_event: threading.Event) -> None:
+        """Read and clean CSV chunks in the background, ending with a None sentinel"""
+        try:
+            for chunk in chunks:
+                if not _put_until_stopped(chunk_queue, chunk, stop_event):
+                    return
+        finally:
+            _put_until_stopped(chunk_queue, None, stop_event)
+    
+    def _load_chunks(self, file_path: str, table_name: str) -> int:
+        """Load a CSV file in chunks, reading ahead while uploading, returns rows loaded"""
         total_rows = 0
         chunk_number = 0
         
-        try:
-            for chunk in pd.read_csv(file_path, chunksize=self.chunk_size):
-                chunk_number += 1
-                
-                # Clean columns
-                chunk = self.clean_column_names(chunk)
+        chunk_queue = queue.Queue(maxsize=self.chunk_queue_size)
+        stop_event = threading.Event()
+        
+        # Infer the schema once, up front, instead of from whichever chunk comes first
+        sample_rows = self.schema_sample_rows
+        sample = self._read_sample(file_path, sample_rows)
+        chunk_rows = self._rows_per_chunk(file_path, sample)
+        if len(sample) == sample_rows and chunk_rows > sample_rows:
+            # Infer from a whole chunk, so types only come from part of the file
+            # when it doesn't fit in one (values past it must fit those types)
+            sample_rows = chunk_rows
+            sample = self._read_first_chunk(file_path, list(sample.columns), sample_rows)
+        logger.info(f"Using memory-safe chunking ({chunk_rows:,} rows per chunk)")
+        
+        # The sampled rows are loaded as they are instead of being parsed again,
+        # and the rest of the file is read after them (unless the sample is all of it)
+        schema = sample.head(0) if isinstance(sample, pd.DataFrame) else self._pandas_schema(sample)
+        chunks = self._split_rows(sample, chunk_rows)
+        if len(sample) == sample_rows:
+            chunks = chain(chunks, self._iter_chunks(file_path, schema, chunk_rows, len(sample)))
+        del sample
+        
+        # All chunks share one connection and are committed together
+        with self._bulk_load_transaction() as cur, ThreadPoolExecutor(max_workers=1) as executor:
+            reader = executor.submit(self._read_chunks, chunks, chunk_queue, stop_event)
+            try:
+                self._create_table(cur, schema, table_name)
                 
-                # Upload chunk (replace on first chunk, append after)
-                mode = 'replace' if chunk_number == 1 else 'append'
-                chunk.to_sql(table_name, self.engine, if_exists=mode, index=False)
+                while True:
+                    chunk = chunk_queue.get()
+                    if chunk is None:
+                        break
+                    chunk_number += 1
+                    
+                    self._copy_chunk(cur, chunk, table_name)
+                    
+                    total_rows += len(chunk)
+                    logger.info(f"Chunk {chunk_number} uploaded. ({total_rows:,} rows total)")
                 
-                total_rows += len(chunk)
-                logger.info(f"Chunk {chunk_number} uploaded. ({total_rows:,} rows total)")
-            
-            logger.info(f"Large file uploaded successfully: {total_rows:,} total rows")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error processing large file in chunks: {e}")
-            return False
+                # Re-raise any error from the reader thread
+                reader.result()
+            finally:
+                stop_event.set()
+        
+        return total_rows
+    
+    def _release_memory(self) -> None:
+        """Drop the chunk-sized COPY buffer and return freed heap memory to the OS"""
+        self._copy_buf = io.BytesIO()
+        if libc is not None and hasattr(libc, 'malloc_trim'):
+            libc.malloc_trim(0)
+    
+    def _copy_file(self, file_path: str, table_name: str) -> int:
+        """Stream a CSV file straight into a new table with COPY, returns rows loaded"""
+        # Only a sample goes through pandas, to infer the table schema
+        sample = self._read_sample(file_path, self.schema_sample_rows)
+        
+        columns = ', '.join(self._quote_identifier(c) for c in sample.columns)
+        copy_sql = (
+            f"COPY {self._quote_identifier(table_name)} ({columns}) "
+            f"FROM STDIN WITH (FORMAT CSV, HEADER TRUE, FREEZE, FORCE_NULL ({columns}))"
+        )
+        
+        with self._bulk_load_transaction() as cur:
+            self._create_table(cur, sample, table_name)
+            with self._open_csv(file_path) as f:
+                cur.copy_expert(copy_sql, f, size=self.read_buffer_size)
+            return cur.rowcount
     
-    def process_standard_file(self, file_path: str, table_name: str) -> bool:
-        """Process standard CSV files"""
+    def process_file(self, file_path: str, table_name: str) -> Optional[int]:
+        """
+        Process a CSV file, streaming it in chunks so memory stays bounded for any size
+        
+        Returns:
+            int: Rows loaded, or None if the file failed to load
+        """
         try:
-            # Read CSV
-            df = pd.read_csv(file_path)
+            if self.stream_copy and self.use_copy:
+                try:
+                    rows = self._copy_file(file_path, table_name)
+                    logger.info(f"File streamed successfully into table '{table_name}' ({rows:,} rows)")
+                    return rows
+                except Exception as e:
+                    # e.g. a value later in the file that doesn't fit the sampled schema
+                    logger.warning(f"Streaming COPY failed, parsing file instead: {e}")
             
-            # Clean column names
-            df = self.clean_column_names(df)
+            rows = self._load_chunks(file_path, table_name)
             
-            # Upload to SQL
-            df.to_sql(table_name, self.engine, if_exists='replace', index=False)
+            logger.info(f"File ingested successfully into table '{table_name}' ({rows:,} rows)")
+            return rows
             
-            logger.info(f"File ingested successfully into table '{table_name}' ({len(df):,} rows)")
+        except Exception as e:
+            logger.error(f"Error processing file: {e}")
+            return None
+        
+        finally:
+            self._release_memory()
+    
+    def create_metadata_table(self) -> bool:
+        """Create the table recording which files were loaded, if it doesn't exist"""
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {METADATA_TABLE} ("
+                    "filename TEXT PRIMARY KEY, size BIGINT, mtime DOUBLE PRECISION, sha256 TEXT, "
+                    "unlogged BOOLEAN, row_count BIGINT)"
+                ))
             return True
-            
         except Exception as e:
-            logger.error(f"Error processing standard file: {e}")
+            logger.error(f"Failed to create ingestion metadata table: {e}")
             return False
     
+    def _file_sha256(self, file_path: str) -> str:
+        """SHA-256 of a file, hashed in one streaming pass"""
+        digest = hashlib.sha256()
+        with self._open_csv(file_path) as f:
+            for block in iter(partial(f.read, self.read_buffer_size), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def _stored_metadata(self, filename: str, table_name: str) -> Optional[tuple]:
+        """Metadata recorded for a file, or None if its table needs loading"""
+        quoted_table = self._quote_identifier(table_name)
+        try:
+            with self.engine.connect() as conn:
+                stored = conn.execute(
+                    text(
+                        f"SELECT m.size, m.mtime, m.sha256, m.unlogged, m.row_count, c.relpersistence "
+                        f"FROM {METADATA_TABLE} m JOIN pg_class c ON c.oid = to_regclass(:table_name) "
+                        "WHERE m.filename = :filename"
+                    ),
+                    {'filename': filename, 'table_name': quoted_table}
+                ).first()
+                
+                # A table loaded with other options is reloaded with the current ones
+                if stored is None or stored.unlogged != self.unlogged_load:
+                    return None
+                
+                # PostgreSQL empties unlogged tables after a crash, but keeps them
+                if stored.relpersistence == 'u' and stored.row_count and not conn.execute(
+                    text(f"SELECT EXISTS (SELECT 1 FROM {quoted_table})")
+                ).scalar():
+                    logger.info(f"Table '{table_name}' was emptied since its last load")
+                    return None
+                
+                return stored
+        except Exception as e:
+            logger.warning(f"Could not read ingestion metadata, loading file: {e}")
+            return None
+    
+    def _record_metadata(self, filename: str, size: int, mtime: float, sha256: Optional[str],
+                         row_count: int) -> None:
+        """Record the file as loaded, so an unchanged copy is skipped next run"""
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(
+                    text(
+                        f"INSERT INTO {METADATA_TABLE} (filename, size, mtime, sha256, unlogged, row_count) "
+                        "VALUES (:filename, :size, :mtime, :sha256, :unlogged, :row_count) "
+                        "ON CONFLICT (filename) DO UPDATE SET "
+                        "size = EXCLUDED.size, mtime = EXCLUDED.mtime, sha256 = EXCLUDED.sha256, "
+                        "unlogged = EXCLUDED.unlogged, row_count = EXCLUDED.row_count"
+                    ),
+                    {
+                        'filename': filename, 'size': size, 'mtime': mtime, 'sha256': sha256,
+                        'unlogged': self.unlogged_load, 'row_count': row_count
+                    }
+                )
+        except Exception as e:
+            logger.warning(f"Could not record ingestion metadata: {e}")
+    
     def process_single_file(self, filename: str) -> bool:
-        """Process a single CSV file"""
+        """Process a single CSV file, skipping it if unchanged since its last load"""
         logger.info("=" * 50)
         logger.info(f"Processing '{filename}'...")
         
         full_file_path = os.path.join(self.csv_folder_path, filename)
         table_name = self.get_table_name(filename)
         
-        # Choose processing method based on file
-        if filename in self.large_files:
-            return self.process_large_file(full_file_path, table_name)
-        else:
-            return self.process_standard_file(full_file_path, table_name)
+        if not self.skip_unchanged:
+            return self.process_file(full_file_path, table_name) is not None
+        
+        try:
+            # Stat before loading, so a file modified mid-load is reloaded next run
+            stat = os.stat(full_file_path)
+            sha256 = None
+            stored = self._stored_metadata(filename, table_name)
+            
+            if stored is not None and stored.size == stat.st_size:
+                if self.verify_hash:
+                    # The hash decides, so a touched but identical file is skipped too
+                    sha256 = self._file_sha256(full_file_path)
+                    unchanged = sha256 == stored.sha256
+                else:
+                    unchanged = stored.mtime == stat.st_mtime
+            
+                if unchanged:
+                    if stored.mtime != stat.st_mtime:
+                        self._record_metadata(
+                            filename, stat.st_size, stat.st_mtime, sha256, stored.row_count
+                        )
+                    logger.info(f"Skipping '{filename}', unchanged since it was loaded into '{table_name}'")
+                    return True
+            
+            if self.verify_hash and sha256 is None:
+                sha256 = self._file_sha256(full_file_path)
+        except Exception as e:
+            # e.g. the file was deleted or can't be read
+            logger.error(f"Error processing file: {e}")
+            return False
+        
+        rows = self.process_file(full_file_path, table_name)
+        if rows is None:
+            return False
+        
+        self._record_metadata(filename, stat.st_size, stat.st_mtime, sha256, rows)
+        return True
     
     def get_csv_files(self) -> list:
         """Get list of CSV files in the folder"""
         try:
-            all_files = os.listdir(self.csv_folder_path)
-            csv_files = [f for f in all_files if f.endswith('.csv')]
+            with os.scandir(self.csv_folder_path) as entries:
+                csv_files = [e.name for e in entries if e.name.endswith('.csv') and e.is_file()]
             logger.info(f"Found {len(csv_files)} CSV file(s) in '{self.csv_folder_path}'")
             return csv_files
         except Exception as e:
@@ -171,6 +908,10 @@ class CSVToPostgresPipeline:
         if not self.connect_to_database():
             return {'status': 'failed', 'reason': 'Database connection failed'}
         
+        # Unchanged files are only skipped once loads are being recorded
+        if self.skip_unchanged and not self.create_metadata_table():
+            self.skip_unchanged = False
+        
         # Get CSV files
         csv_files = self.get_csv_files()
         if not csv_files:
@@ -184,8 +925,27 @@ class CSVToPostgresPipeline:
             'failed_files': []
         }
         
+        # Standard files go to a process pool, large files are loaded here
+        # meanwhile (they already overlap reading and uploading internally)
+        standard_files = [f for f in csv_files if f not in self.large_files]
+        large_files = [f for f in csv_files if f in self.large_files]
+        outcomes = {}
+        
+        if standard_files:
+            max_workers = min(len(standard_files), self.max_workers)
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                standard_outcomes = executor.map(
+                    partial(_process_file_in_worker, self), standard_files, chunksize=1
+                )
+                for filename in large_files:
+                    outcomes[filename] = self.process_single_file(filename)
+                outcomes.update(zip(standard_files, standard_outcomes))
+        else:
+            for filename in large_files:
+                outcomes[filename] = self.process_single_file(filename)
+        
         for filename in csv_files:
-            if self.process_single_file(filename):
+            if outcomes[filename]:
                 results['successful'] += 1
             else:
                 results['failed'] += 1
@@ -205,6 +965,16 @@ class CSVToPostgresPipeline:
         return results
 
 
+def _process_file_in_worker(pipeline: CSVToPostgresPipeline, filename: str) -> bool:
+    """Process a single file in a worker process with its own database engine"""
+    if not pipeline.connect_to_database():
+        return False
+    try:
+        return pipeline.process_single_file(filename)
+    finally:
+        pipeline.engine.dispose()
+
+
 # Main execution
 if __name__ == "__main__":
     # All configuration comes from environment variables